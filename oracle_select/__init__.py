@@ -1 +1 @@
-from .select import DB
\ No newline at end of file
+from .select import DB, makeDictFactory, makeNamedTupleFactory
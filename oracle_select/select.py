@@ -1,71 +1,240 @@
 from attrdict import AttrDict
-import copy
-import cx_Oracle
+from collections import namedtuple
+from functools import lru_cache
+import itertools
+import os
+import threading
+import oracledb
 
 
-def makeDictFactory(cursor):
+def _read_lob_streaming(lob, size):
     """
-    Return a dict of values after reading any LOB-like objects
+    Read a LOB of ``size`` units in multiples of its chunk size rather than
+    in a single call
+
+    Offsets advance by the requested amount rather than by the length of
+    the data returned, since CLOB offsets count UCS-2 code units.
+    """
+    cs = lob.getchunksize()
+    amount = 32 * cs
+    parts = [lob.read(offset, amount)
+             for offset in range(1, size + 1, amount)]
+    if lob.type in (oracledb.DB_TYPE_CLOB, oracledb.DB_TYPE_NCLOB):
+        return ''.join(parts)
+    return b''.join(parts)
+
+
+def _read_lob(lob, lob_prefetch):
+    """
+    Read a LOB locator, streaming it if it is larger than ``lob_prefetch``
+    """
+    size = lob.size()
+    if size > lob_prefetch:
+        return _read_lob_streaming(lob, size)
+    return lob.read()
+
+
+def _fetch_all(cursor):
+    """
+    Fetch all remaining rows in batches of ``cursor.arraysize``
+    """
+    rows = []
+    extend = rows.extend
+    while True:
+        batch = cursor.fetchmany(cursor.arraysize)
+        if not batch:
+            break
+        extend(batch)
+    return rows
+
+
+def _col_names(cursor):
+    return tuple(d[0].lower() for d in cursor.description)
+
+
+@lru_cache(maxsize=128)
+def _record_cls(field_names):
+    return namedtuple('Record', field_names=field_names, rename=True)
+
+
+@lru_cache(maxsize=128)
+def _dict_row(col_names):
+    def createRow(*args, _names=col_names, _zip=zip, _dict=AttrDict):
+        return _dict(_zip(_names, args))
+    return createRow
+
+
+def makeDictFactory(cursor, lob_prefetch=None):
+    """
+    Return a dict of values for each row
+
+    If ``lob_prefetch`` is given, any LOB locators in the row are read into
+    strings/bytes, streaming those larger than ``lob_prefetch``.
+    """
+    col_names = _col_names(cursor)
+    if lob_prefetch is None:
+        return _dict_row(col_names)
+
+    def createRow(*args):
+        values = [_read_lob(arg, lob_prefetch)
+                  if isinstance(arg, oracledb.LOB) else arg
+                  for arg in args]
+        return AttrDict(zip(col_names, values))
+    return createRow
+
+
+def makeNamedTupleFactory(cursor, lob_prefetch=None):
+    """
+    Return a namedtuple of values for each row
+
+    If ``lob_prefetch`` is given, any LOB locators in the row are read into
+    strings/bytes, streaming those larger than ``lob_prefetch``.
     """
-    col_names = [d[0].lower() for d in cursor.description]
+    record = _record_cls(_col_names(cursor))
+    if lob_prefetch is None:
+        return record
+
     def createRow(*args):
-        read_args = []
-        for arg in args:
-            if isinstance(cx_Oracle.LOB, cx_Oracle.CLOB):
-                v = arg.read()
-                try:
-                    arg.close()
-                    del arg
-                except:
-                    pass
-            else:
-                v = arg
-            read_args.append(v)
-        del args
-        return AttrDict(dict(zip(col_names, read_args)))
+        return record(*[_read_lob(arg, lob_prefetch)
+                        if isinstance(arg, oracledb.LOB) else arg
+                        for arg in args])
     return createRow
 
 
 class DB(object):
-    """Database object"""
+    """
+    Database object
+
+    Each process gets its own connection pool, created on first use, so a DB
+    instance can be pickled or used after a fork.
+    """
 
-    def __init__(self, host, username, password):
+    def __init__(self, host, username, password, lob_locators=False,
+                 lob_prefetch=1_048_576, stmtcachesize=50):
+        """
+        Parameters
+        ----------
+        host:         The DSN of the database.
+        username:     The username to connect with.
+        password:     The password to connect with.
+        lob_locators: If True, LOB columns are fetched as locators and read
+                      row by row instead of inline with the fetch
+                      (default: False).
+        lob_prefetch: When reading LOB locators, LOBs larger than this many
+                      bytes/characters are streamed in chunk-sized reads
+                      (default: 1 MiB).
+        stmtcachesize: The number of prepared statements each pooled
+                      connection keeps cached, so repeated selects of the
+                      same SQL skip re-parsing (default: 50).
+        """
         self.host = host
         self.username = username
         self.password = password
+        self.lob_locators = lob_locators
+        self.lob_prefetch = lob_prefetch
+        self._pool_kwargs = dict(
+            user=username, password=password, dsn=host, min=2, max=10,
+            increment=1, getmode=oracledb.POOL_GETMODE_WAIT,
+            stmtcachesize=stmtcachesize)
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_pools'], state['_pools_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pools = {}
+        self._pools_lock = threading.Lock()
+
+    @property
+    def pool(self):
+        """The connection pool for the current process."""
+        pid = os.getpid()
+        p = self._pools.get(pid)
+        if p is None:
+            with self._pools_lock:
+                p = self._pools.get(pid)
+                if p is None:
+                    p = self._pools[pid] = oracledb.create_pool(
+                        **self._pool_kwargs)
+        return p
+
+    def close(self):
+        """Close this process's connection pool and all of its connections."""
+        with self._pools_lock:
+            p = self._pools.pop(os.getpid(), None)
+        if p is not None:
+            p.close()
+
+    def _rowfactory(self, cursor, namedtuples=False):
+        factory = makeNamedTupleFactory if namedtuples else makeDictFactory
+        return factory(cursor, self.lob_prefetch if self.lob_locators else None)
+
+    def select(self, sql, binds=None, fetch=0, arraysize=1000,
+               namedtuples=False):
+        """
+        Select records.
+
+        Parameters
+        ----------
+        sql:        The sql to execute
+        binds:      A tuple or dict of bind variables to use (default: None).
+        fetch:      The number of rows to fetch. If 0, all rows will be
+                    returned (default: 0).
+        arraysize:  The number of rows to fetch per round-trip when fetching
+                    all rows (default: 1000).
+        namedtuples: If True, rows are returned as namedtuples instead of
+                    dicts (default: False).
+
+        Returns
+        -------
+        A list of dicts (or namedtuples) matching the result set.
+        """
+        with self.pool.acquire() as db, db.cursor() as c:
+            # arraysize and prefetchrows must be set before execute() to take
+            # effect on the first round-trip
+            c.arraysize = fetch or arraysize
+            c.prefetchrows = c.arraysize + 1
+            c.execute(sql, binds, fetch_lobs=self.lob_locators)
+            c.rowfactory = self._rowfactory(c, namedtuples)
+            return c.fetchmany(fetch) if fetch else _fetch_all(c)
+
+    def select_df(self, sql, binds=None, arraysize=1000):
+        """
+        Select records into a pandas DataFrame.
+
+        Rows are fetched as plain tuples and passed to
+        ``pd.DataFrame.from_records`` with the column names, instead of
+        building a dict per row as ``pd.DataFrame(db.select(sql))`` would.
+        Requires pandas.
+
+        Parameters
+        ----------
+        sql:        The sql to execute
+        binds:      A tuple or dict of bind variables to use (default: None).
+        arraysize:  The number of rows to fetch per round-trip
+                    (default: 1000).
+
+        Returns
+        -------
+        A DataFrame with one lower-cased column per selected column.
+        """
+        import pandas as pd
+
+        with self.pool.acquire() as db, db.cursor() as c:
+            c.arraysize = arraysize
+            c.prefetchrows = arraysize + 1
+            c.execute(sql, binds, fetch_lobs=self.lob_locators)
+            if self.lob_locators:
+                c.rowfactory = self._rowfactory(c, namedtuples=True)
+            rows = _fetch_all(c)
+            return pd.DataFrame.from_records(rows, columns=_col_names(c))
 
-    def select(self, sql, binds=None, fetch=0):
-        db = cx_Oracle.connect(self.username, self.password, self.host)
-        c = db.cursor()
-
-        try:
-            if binds:
-                c.execute(sql, binds)
-            else:
-                c.execute(sql)
-        except Exception as e:
-            c.close()
-            db.close()
-            raise
-
-        c.rowfactory = makeDictFactory(c)
-
-        try:
-            if fetch:
-                r = c.fetchmany(fetch)
-            else:
-                r = c.fetchall()
-        except Exception as e:
-            raise
-        else:
-            rs = copy.deepcopy(r)
-            return rs
-        finally:
-            del r
-            c.close()
-            db.close()
-
-    def select_iter(self, sql, binds=None, fetch_size=1000, max_rows=None):
+    def select_iter(self, sql, binds=None, fetch_size=1000, max_rows=None,
+                    namedtuples=False):
         """
         Select records in chunks using a generator.
 
@@ -76,51 +245,27 @@ class DB(object):
         fetch_size: The size of the chunks to yield on each iteration.
         max_rows:   The maximum number of rows to fetch. If None, all rows will
                     eventually be returned (default: None).
+        namedtuples: If True, rows are returned as namedtuples instead of
+                    dicts (default: False).
+
+        Each chunk is fetched from the database in a single round-trip.
 
         Yields
         ------
         A list of dicts matching the result set. Each iteration will yield a
         new chunk of data according to the fetch_size given.
         """
-        db = cx_Oracle.connect(self.username, self.password, self.host)
-        c = db.cursor()
-
-        try:
-            if binds:
-                c.execute(sql, binds)
-            else:
-                c.execute(sql)
-        except Exception as e:
-            c.close()
-            db.close()
-            raise
-
-        c.rowfactory = makeDictFactory(c)
-
-        try:
+        with self.pool.acquire() as db, db.cursor() as c:
+            c.arraysize = fetch_size
+            c.prefetchrows = fetch_size + 1
+            c.execute(sql, binds, fetch_lobs=self.lob_locators)
+            c.rowfactory = self._rowfactory(c, namedtuples)
+
+            it = iter(c)
             if max_rows:
-                i = 0
-                while i <= max_rows:
-                    results = c.fetchmany(fetch_size)
-                    if not results:
-                        break
-                    else:
-                        rs = copy.deepcopy(results)
-                        del results
-                        i += len(rs)
-                        yield rs
-            else:
-                while True:
-                    results = c.fetchmany(fetch_size)
-                    if not results:
-                        break
-                    else:
-                        rs = copy.deepcopy(results)
-                        del results
-                        for result in rs:
-                            yield result
-        except:
-            raise
-        finally:
-            c.close()
-            db.close()
+                it = itertools.islice(it, max_rows)
+            while True:
+                chunk = list(itertools.islice(it, fetch_size))
+                if not chunk:
+                    break
+                yield chunk
@@ -36,7 +36,8 @@ def format_list(items, parenthesis=True):
     if len(items) > 1000:
         raise ValueError('Lists are limited to 1000 items.')
     formatted_list = ', '.join(
-        [f"'{item}'" if isinstance(item, str) else str(item) for item in items])
+        "'" + item + "'" if isinstance(item, str) else str(item)
+        for item in items)
     if parenthesis:
         return f"({formatted_list})"
     else:
@@ -1,4 +1,7 @@
-import pandas as pd
+import numpy as np
+
+_WORKING_STATUSES = np.array([5, 6, 7, 11, 14, 15, 16, 18])
+_COMPLETE_STATUSES = np.array([9])
 
 
 def _process_monitor(db, processes, freq=5, timeout=60*60*4, on_success=None,
@@ -38,26 +41,17 @@ def _process_monitor(db, processes, freq=5, timeout=60*60*4, on_success=None,
     ------
     Exception
         If a job fails.
+    ValueError
+        If any of the processes are not found in the process monitor.
     TimeOutError
         If the timeout is reached but the jobs have not yet finished.
     """
     from IPython import display
     import time
 
-    WORKING_STATUSES = [5, 6, 7, 11, 14, 15, 16, 18]
-    COMPLETE_STATUSES = [9]
-
-    def set_status(code):
-        code = int(code)
-        if code in COMPLETE_STATUSES:
-            return 'Finished'
-        elif code in WORKING_STATUSES:
-            return 'Working'
-        else:
-            return 'Failed'
-
     if isinstance(processes, (str, int)):
             processes = [processes]
+    processes = list(dict.fromkeys(int(prcs) for prcs in processes))
 
     sql = """
         select
@@ -72,34 +66,49 @@ def _process_monitor(db, processes, freq=5, timeout=60*60*4, on_success=None,
         where
             prcsinstance in ({})
         order by prcsinstance"""
-    prepared_sql = sql.format(', '.join(
-        [f"'{prcs}'" for prcs in processes]))
+    binds = {f"p{i}": prcs for i, prcs in enumerate(processes)}
+    prepared_sql = sql.format(', '.join(':' + k for k in binds))
     start = time.time()
+    next_tick = start
 
     while time.time() - start <= timeout:
+        df = db.select_df(prepared_sql, binds=binds,
+                          arraysize=len(processes))
         display.clear_output(wait=True)
-        df = pd.DataFrame(db.select(prepared_sql))
-        df['status'] = df.runstatus.apply(set_status)
+        missing = set(processes).difference(df.prcsinstance.astype(int))
+        if missing:
+            raise ValueError('Process instance(s) not found: {}'.format(
+                ', '.join(str(prcs) for prcs in sorted(missing))))
+        codes = df.runstatus.to_numpy().astype(int)
+        working = np.isin(codes, _WORKING_STATUSES)
+        complete = np.isin(codes, _COMPLETE_STATUSES)
+        failed = ~(working | complete)
+        df['status'] = np.select([complete, working], ['Finished', 'Working'],
+                                 'Failed')
 
         msg = "{time}: {status}"
 
-        if (df.status == 'Finished').all():
-            status = 'Complete'
-            print(msg.format(time=time.strftime('%I:%M:%S %p'), status=status))
-            if on_success:
-                on_success(df)
-            return df
-        elif (df.status == 'Failed').any():
+        if failed.any():
             status = 'Failed'
             print(msg.format(time=time.strftime('%I:%M:%S %p'), status=status))
             if on_failure:
                 on_failure(df)
             raise Exception('A job failure was detected.')
-        elif (df.status == 'Working').any():
+        elif not working.any():
+            status = 'Complete'
+            print(msg.format(time=time.strftime('%I:%M:%S %p'), status=status))
+            if on_success:
+                on_success(df)
+            return df
+        else:
             status = 'Working'
             print(msg.format(time=time.strftime('%I:%M:%S %p'), status=status))
             display.display(df)
-            time.sleep(freq)
-        else:
-            raise Exception('Something went wrong.')
+            next_tick += freq
+            delay = next_tick - time.time()
+            if delay <= 0:
+                # the query overran the poll interval; skip missed ticks
+                next_tick += freq * (int(-delay // freq) + 1)
+                delay = next_tick - time.time()
+            time.sleep(max(delay, 0))
     raise TimeOutError('Timeout reached.')
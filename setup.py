@@ -15,17 +15,17 @@ setup(name='oracle_select',
         'License :: OSI Approved :: MIT License',
         'Programming Language :: Python :: 3.6'
       ],
-      keywords='oracle cx_Oracle',
+      keywords='oracle oracledb',
       author='Jamie Davis',
       author_email='jamjam@umich.edu',
       license='MIT',
       packages=['oracle_select'],
       install_requires=[
           'attrdict',
-          'cx_Oracle',
+          'oracledb>=3.0',
       ],
       extras_require={
-        'utils': ['pandas', 'IPython']
+        'utils': ['numpy', 'pandas', 'IPython']
       },
       include_package_data=True,
       zip_safe=False)